@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 """
 ExtractorVideos.py  –  Lógica de chunks + llamada a Groq,
-con fallback a yt-dlp + webvtt-py preservando timestamps y chunking.
+con fallback a yt-dlp + parser VTT propio preservando timestamps y chunking.
 """
 
 import os
 import re
+import json
+import orjson
+import asyncio
+import time
+import sqlite3
 import logging
-from typing import List, Dict
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Optional
 from dotenv import load_dotenv
 from youtube_transcript_api import (
     YouTubeTranscriptApi,
@@ -15,11 +25,7 @@ from youtube_transcript_api import (
     TranscriptsDisabled,
     VideoUnavailable,
 )
-from yt_dlp import YoutubeDL
-import requests
-from io import StringIO
-import webvtt
-from groq import Groq
+from groq import Groq, AsyncGroq
 
 # ── Configuración básica ───────────────────────────────────────────────────────
 logging.basicConfig(level=logging.INFO)
@@ -28,10 +34,93 @@ API_KEY = os.getenv("GROQ_API_KEY")
 if not API_KEY:
     raise RuntimeError("❌ No se encontró la variable GROQ_API_KEY en el entorno.")
 client = Groq(api_key=API_KEY)
+client_async = AsyncGroq(api_key=API_KEY)
+# Cota de llamadas a Groq en vuelo: el cliente async escala a cientos de
+# peticiones concurrentes sin hilos, pero sin una cota un pico de tráfico
+# se traduciría directamente en rate-limits del proveedor.
+GROQ_SEMA = asyncio.Semaphore(32)
+
+# ── Caché de chunks por vídeo ──────────────────────────────────────────────────
+# Evita repetir la descarga/parseo del transcript cuando se hacen varias
+# preguntas sobre el mismo vídeo: primero un dict en memoria y, como respaldo
+# entre reinicios, una tabla SQLite en .cache/.
+class _LRUDict(OrderedDict):
+    """Dict con desalojo LRU acotado, para las cachés en memoria del módulo."""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        if key in self:
+            self.move_to_end(key)
+            return super().__getitem__(key)
+        return default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+_CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+_CACHE_DB = _CACHE_DIR / "chunks.sqlite3"
+_CHUNK_CACHE: "_LRUDict" = _LRUDict(maxsize=512)
+_CACHE_LOCK = threading.Lock()
+
+def _cache_db() -> sqlite3.Connection:
+    _CACHE_DIR.mkdir(exist_ok=True)
+    conn = sqlite3.connect(_CACHE_DB)
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS chunks (
+               video_id    TEXT NOT NULL,
+               languages   TEXT NOT NULL,
+               chunks_json TEXT NOT NULL,
+               fetched_at  REAL NOT NULL,
+               PRIMARY KEY (video_id, languages)
+           )"""
+    )
+    return conn
+
+def _cache_get(video_id: str, languages: tuple) -> Optional[List[Dict[str, str]]]:
+    key = (video_id, languages)
+    with _CACHE_LOCK:
+        cached = _CHUNK_CACHE.get(key)
+    if cached is not None:
+        return cached
+    try:
+        with _cache_db() as conn:
+            row = conn.execute(
+                "SELECT chunks_json FROM chunks WHERE video_id=? AND languages=?",
+                (video_id, ",".join(languages)),
+            ).fetchone()
+    except sqlite3.Error as e:
+        logging.warning(f"Caché SQLite ilegible: {e}")
+        return None
+    if not row:
+        return None
+    chunks = json.loads(row[0])
+    with _CACHE_LOCK:
+        _CHUNK_CACHE[key] = chunks
+    return chunks
+
+def _cache_put(video_id: str, languages: tuple, chunks: List[Dict[str, str]]) -> None:
+    with _CACHE_LOCK:
+        _CHUNK_CACHE[(video_id, languages)] = chunks
+    try:
+        with _cache_db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chunks VALUES (?,?,?,?)",
+                (video_id, ",".join(languages), json.dumps(chunks), time.time()),
+            )
+    except sqlite3.Error as e:
+        logging.warning(f"No se pudo persistir la caché: {e}")
 
 # ── Helpers de tiempo y chunking ────────────────────────────────────────────────
+_VIDEO_ID_RE = re.compile(r"(?:v=|be/)([\w-]{11})")
+
 def extract_video_id(arg: str) -> str:
-    m = re.search(r"(?:v=|be/)([\w-]{11})", arg)
+    m = _VIDEO_ID_RE.search(arg)
     return m.group(1) if m else arg
 
 def seconds_to_timestamp(sec: float) -> str:
@@ -39,7 +128,9 @@ def seconds_to_timestamp(sec: float) -> str:
     h, rem = divmod(total_ms, 3_600_000)
     m, rem = divmod(rem, 60_000)
     s, ms = divmod(rem, 1000)
-    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+    # Formateador % a nivel de C: notablemente más rápido que el f-string
+    # equivalente, y esto se llama dos veces por chunk en vídeos largos.
+    return "%02d:%02d:%02d.%03d" % (h, m, s, ms)
 
 def parse_segments(
     raw: List[Dict[str, float]],
@@ -50,26 +141,32 @@ def parse_segments(
     Agrupa raw=[{"start","end","text"}] en chunks según duración y longitud.
     Devuelve [{"ts_range","text"},…].
     """
-    chunks, curr = [], None
-    for seg in raw:
-        if curr is None:
-            curr = seg.copy()
-            continue
-        dur    = seg["end"] - curr["start"]
-        length = len(curr["text"]) + 1 + len(seg["text"])
+    if not raw:
+        return []
+
+    # Una sola pasada que solo detecta índices de corte: nada de copiar dicts
+    # ni concatenar strings segmento a segmento (O(N²) en vídeos largos).
+    bounds = []
+    start_i     = 0
+    chunk_start = raw[0]["start"]
+    chunk_len   = len(raw[0]["text"])
+    for i in range(1, len(raw)):
+        seg    = raw[i]
+        dur    = seg["end"] - chunk_start
+        length = chunk_len + 1 + len(seg["text"])
         if dur > max_seconds or length > max_chars:
-            chunks.append(curr)
-            curr = seg.copy()
+            bounds.append((start_i, i))
+            start_i     = i
+            chunk_start = seg["start"]
+            chunk_len   = len(seg["text"])
         else:
-            curr["end"]   = seg["end"]
-            curr["text"] += " " + seg["text"]
-    if curr:
-        chunks.append(curr)
+            chunk_len = length
+    bounds.append((start_i, len(raw)))
 
     result = []
-    for ch in chunks:
-        ts = f"[{seconds_to_timestamp(ch['start'])}–{seconds_to_timestamp(ch['end'])}]"
-        result.append({"ts_range": ts, "text": ch["text"]})
+    for a, b in bounds:
+        ts = f"[{seconds_to_timestamp(raw[a]['start'])}–{seconds_to_timestamp(raw[b-1]['end'])}]"
+        result.append({"ts_range": ts, "text": " ".join(s["text"] for s in raw[a:b])})
     return result
 
 # ── Extracción principal con fallback ──────────────────────────────────────────
@@ -78,12 +175,61 @@ def get_timestamped_chunks(
     languages=("es","en")
 ) -> List[Dict[str, str]]:
     """
-    Intenta con youtube-transcript-api; si falla, usa fallback yt-dlp + webvtt.
-    Devuelve lista de chunks con ts_range y text.
+    Intenta con youtube-transcript-api; si falla, usa fallback yt-dlp + VTT.
+    Devuelve lista de chunks con ts_range y text, cacheados por (video_id, languages).
+    """
+    languages = tuple(languages)
+    cached = _cache_get(video_id, languages)
+    if cached is not None:
+        logging.info("Chunks servidos desde caché")
+        return cached
+    chunks = _fetch_timestamped_chunks(video_id, languages)
+    _cache_put(video_id, languages, chunks)
+    return chunks
+
+def _fetch_transcript_any(video_id: str, languages: tuple):
+    """
+    Lanza una petición por idioma en paralelo y devuelve el primer transcript
+    que llegue: si el primer idioma no existe o va lento, no pagamos su
+    timeout completo antes de probar el siguiente.
     """
+    if len(languages) <= 1:
+        return YouTubeTranscriptApi.get_transcript(video_id, languages=list(languages))
+
+    pool = ThreadPoolExecutor(max_workers=len(languages))
+    try:
+        pending = {
+            pool.submit(YouTubeTranscriptApi.get_transcript, video_id, languages=[lang])
+            for lang in languages
+        }
+        errors = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    errors.append(e)
+                else:
+                    for f in pending:
+                        f.cancel()
+                    return result
+        # Todos fallaron: prioriza errores «inesperados» (red, etc.) para que
+        # el caller active el fallback yt-dlp, igual que con un solo fetch.
+        for e in errors:
+            if not isinstance(e, (TranscriptsDisabled, NoTranscriptFound)):
+                raise e
+        raise errors[0]
+    finally:
+        pool.shutdown(wait=False)
+
+def _fetch_timestamped_chunks(
+    video_id: str,
+    languages: tuple
+) -> List[Dict[str, str]]:
     try:
         logging.info("Intentando youtube-transcript-api")
-        raw = YouTubeTranscriptApi.get_transcript(video_id, languages=languages)
+        raw = _fetch_transcript_any(video_id, languages)
         segs = [
             {"start": s["start"], "end": s["start"] + s["duration"], "text": s["text"].strip()}
             for s in raw
@@ -95,20 +241,101 @@ def get_timestamped_chunks(
         raise RuntimeError("El vídeo no está disponible.")
     except Exception as e:
         logging.warning(f"youtube-transcript-api falló ({type(e).__name__}): {e}")
-        logging.info("Ha fallado youtube-transcript-api, usando fallback con yt-dlp + webvtt")
+        logging.info("Ha fallado youtube-transcript-api, usando fallback con yt-dlp + VTT")
         return get_timestamped_chunks_yt_dlp(video_id)
 
-# ── Fallback con yt-dlp + webvtt ──────────────────────────────────────────────
-def get_timestamped_chunks_yt_dlp(
-    video_id: str,
-    languages: tuple = ("es","en"),
-    max_seconds: int = 30,
-    max_chars:   int = 500
-) -> List[Dict[str, str]]:
+# ── Fallback con yt-dlp + VTT ────────────────────────────────────────────────
+_TS_RE = re.compile(r"(?:(\d+):)?(\d+):([\d.]+)")
+_WS_RE = re.compile(r"\s+")
+
+_CUE_TIMING_RE = re.compile(r"([\d:.]+)\s+-->\s+([\d:.]+)")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+def _parse_ts(s: str) -> float:
+    """Convierte un timestamp VTT «HH:MM:SS.mmm» (o «MM:SS.mmm») a segundos."""
+    h, m, sec = _TS_RE.match(s).groups()
+    return (int(h) * 3600 if h else 0) + int(m) * 60 + float(sec)
+
+def _iter_vtt_cues(lines):
     """
-    Extrae subtítulos con yt-dlp + webvtt, luego chunking igual que get_timestamped_chunks.
+    Parser incremental de WebVTT: consume líneas según llegan y genera
+    (start, end, text) al cerrarse cada cue (línea en blanco o nuevo timing).
+    Ignora cabecera, NOTE e identificadores de cue; elimina tags <c>, <i>, etc.
     """
-    logging.info("FALLBACK: extrayendo con yt-dlp + webvtt")
+    start = end = None
+    text_parts = []
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            if start is not None and text_parts:
+                yield start, end, " ".join(text_parts)
+            start = None
+            text_parts = []
+        elif "-->" in stripped:
+            if start is not None and text_parts:
+                yield start, end, " ".join(text_parts)
+                text_parts = []
+            m = _CUE_TIMING_RE.match(stripped)
+            if not m:
+                raise RuntimeError(f"Línea de timing VTT inválida: {stripped!r}")
+            start, end = _parse_ts(m.group(1)), _parse_ts(m.group(2))
+        elif start is not None:
+            text = _WS_RE.sub(" ", _TAG_RE.sub("", stripped)).strip()
+            if text:
+                text_parts.append(text)
+    if start is not None and text_parts:
+        yield start, end, " ".join(text_parts)
+
+# Sesión HTTP compartida: reutiliza conexiones TCP/TLS entre la resolución
+# InnerTube y las descargas de VTT en vez de abrir una nueva por petición.
+# Se crea perezosamente: requests (y yt-dlp más abajo) solo se importan si
+# el fallback llega a ejecutarse, no en el arranque de cada worker.
+_HTTP = None
+_HTTP_LOCK = threading.Lock()
+_HTTP_TIMEOUT = (3.05, 10)
+
+def _get_http():
+    global _HTTP
+    if _HTTP is None:
+        with _HTTP_LOCK:
+            if _HTTP is None:
+                import requests
+                session = requests.Session()
+                session.headers.update({"User-Agent": "Mozilla/5.0 (X11; Linux x86_64)"})
+                _HTTP = session
+    return _HTTP
+
+# Endpoint «player» de InnerTube: una sola llamada HTTP para resolver los
+# caption tracks, frente al pipeline completo de extractores de yt-dlp.
+_INNERTUBE_PLAYER_URL = "https://www.youtube.com/youtubei/v1/player"
+_INNERTUBE_CONTEXT = {
+    "client": {
+        "clientName": "ANDROID",
+        "clientVersion": "20.10.38",
+        "androidSdkVersion": 30,
+    }
+}
+_VTT_URL_CACHE: "_LRUDict" = _LRUDict(maxsize=256)
+
+def _resolve_vtt_url_innertube(video_id: str, languages: tuple) -> str:
+    resp = _get_http().post(
+        _INNERTUBE_PLAYER_URL,
+        json={"videoId": video_id, "context": _INNERTUBE_CONTEXT},
+        timeout=_HTTP_TIMEOUT,
+    )
+    resp.raise_for_status()
+    tracks = resp.json()["captions"]["playerCaptionsTracklistRenderer"]["captionTracks"]
+    for lang in languages:
+        for track in tracks:
+            if track.get("languageCode", "").split("-")[0] == lang:
+                return track["baseUrl"] + "&fmt=vtt"
+    raise RuntimeError("InnerTube no ofrece caption tracks en los idiomas pedidos")
+
+def _resolve_vtt_url_yt_dlp(video_id: str, languages: tuple) -> str:
+    # Import perezoso: yt-dlp arrastra decenas de módulos de extractores y
+    # solo hace falta si InnerTube falla.
+    from yt_dlp import YoutubeDL
+
     url = f"https://www.youtube.com/watch?v={video_id}"
     ydl_opts = {
         "skip_download": True,
@@ -121,50 +348,89 @@ def get_timestamped_chunks_yt_dlp(
     with YoutubeDL(ydl_opts) as ydl:
         info = ydl.extract_info(url, download=False)
 
-    # Obtén la URL del archivo VTT
     subs = info.get("requested_subtitles") or info.get("automatic_captions") or info.get("subtitles") or {}
-    vtt_url = None
     for lang in languages:
         if lang in subs:
             entry = subs[lang]
             if isinstance(entry, list):
                 entry = entry[0]
-            vtt_url = entry.get("url")
-            break
-    if not vtt_url:
-        raise RuntimeError("No hay subtítulos VTT disponibles en yt-dlp")
+            if entry.get("url"):
+                return entry["url"]
+    raise RuntimeError("No hay subtítulos VTT disponibles en yt-dlp")
 
-    # Descarga y parsea el VTT
-    resp = requests.get(vtt_url)
-    resp.raise_for_status()
-    buffer = StringIO(resp.text)
+def _resolve_vtt_url(video_id: str, languages: tuple) -> str:
+    """
+    Resuelve la URL del VTT: primero InnerTube (una llamada HTTP), con yt-dlp
+    como respaldo si YouTube cambia el formato. Cachea el resultado por vídeo
+    para reusarlo entre reintentos.
+    """
+    key = (video_id, languages)
+    cached = _VTT_URL_CACHE.get(key)
+    if cached is not None:
+        return cached
     try:
-        cues = list(webvtt.read_buffer(buffer))
+        vtt_url = _resolve_vtt_url_innertube(video_id, languages)
     except Exception as e:
-        raise RuntimeError(f"Error al parsear VTT: {e}")
+        logging.warning(f"InnerTube falló ({type(e).__name__}): {e}; probando yt-dlp")
+        vtt_url = _resolve_vtt_url_yt_dlp(video_id, languages)
+    _VTT_URL_CACHE[key] = vtt_url
+    return vtt_url
+
+def get_timestamped_chunks_yt_dlp(
+    video_id: str,
+    languages: tuple = ("es","en"),
+    max_seconds: int = 30,
+    max_chars:   int = 500
+) -> List[Dict[str, str]]:
+    """
+    Extrae subtítulos vía InnerTube/yt-dlp + parser VTT en streaming,
+    luego chunking igual que get_timestamped_chunks.
+    """
+    logging.info("FALLBACK: extrayendo VTT vía InnerTube/yt-dlp")
+    vtt_url = _resolve_vtt_url(video_id, tuple(languages))
 
-    # Convierte cues a raw segments
+    # Descarga en streaming y parsea el VTT según llegan las líneas,
+    # sin materializar el fichero completo en memoria.
+    resp = _get_http().get(vtt_url, stream=True, timeout=_HTTP_TIMEOUT)
+    resp.raise_for_status()
     raw = []
-    for c in cues:
-        h, m, s = c.start.split(":")
-        start = int(h)*3600 + int(m)*60 + float(s)
-        h, m, s = c.end.split(":")
-        end = int(h)*3600 + int(m)*60 + float(s)
-        raw.append({
-            "start": start,
-            "end":   end,
-            "text":  c.text.replace("\n"," ").strip()
-        })
+    try:
+        for start, end, text in _iter_vtt_cues(resp.iter_lines(decode_unicode=True)):
+            raw.append({"start": start, "end": end, "text": text})
+    except RuntimeError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"Error al parsear VTT: {e}")
+    finally:
+        resp.close()
     return parse_segments(raw, max_seconds=max_seconds, max_chars=max_chars)
 
 # ── Construcción del prompt y llamada a Groq ─────────────────────────────────
-def build_qa_prompt(chunks: List[Dict[str, str]], question: str) -> str:
-    lines = "\n".join(f"{c['ts_range']} {c['text']}" for c in chunks)
-    return f"""
-Vas a recibir la transcripción segmentada de un vídeo de YouTube, en bloques de texto con su intervalo de tiempo:
-{lines}
+# Enrutado por niveles: el 8B de Groq es ~5× más rápido por token y basta para
+# preguntas factuales sobre transcripts cortos; el 70B queda para prompts
+# largos o preguntas que piden razonamiento.
+MODEL_FAST  = "llama-3.1-8b-instant"
+MODEL_SMART = "llama-3.3-70b-versatile"
+
+_REASONING_RE = re.compile(
+    r"por qué|explica|compara|razona|analiza|resume|diferencia|opini[oó]n|argumenta|why|explain|compare|summar",
+    re.IGNORECASE,
+)
+
+def _needs_reasoning(question: str) -> bool:
+    return bool(_REASONING_RE.search(question))
+
+def _pick_model(messages: List[Dict[str, str]], question: str) -> str:
+    total = sum(len(m["content"]) for m in messages)
+    return MODEL_FAST if total < 6000 and not _needs_reasoning(question) else MODEL_SMART
 
-A continuación, un usuario hará una pregunta concreta sobre el contenido del vídeo.
+# Plantillas fijas compiladas una vez a nivel de módulo: el transcript va en
+# el mensaje system (grande, idéntico para todas las preguntas del vídeo) y
+# la instrucción + pregunta en el mensaje user (pequeño, cambia por petición).
+_SYSTEM_TEMPLATE = """Vas a recibir la transcripción segmentada de un vídeo de YouTube, en bloques de texto con su intervalo de tiempo:
+{lines}"""
+
+_USER_TEMPLATE = """A continuación, un usuario hará una pregunta concreta sobre el contenido del vídeo.
 Tu tarea es:
   • Leer los bloques con sus timestamps.
   • Identificar las partes relevantes.
@@ -173,31 +439,176 @@ Tu tarea es:
 Pregunta del usuario:
 {question}
 
-Respuesta:
-""".strip()
+Respuesta:"""
+
+@lru_cache(maxsize=128)
+def _transcript_block_from_items(items: tuple) -> str:
+    # Acumula piezas en una lista y une una sola vez: evita crear un f-string
+    # intermedio por chunk cuando hay miles de bloques.
+    buf = []
+    append = buf.append
+    for ts_range, text in items:
+        append(ts_range)
+        append(" ")
+        append(text)
+        append("\n")
+    return "".join(buf).rstrip("\n")
 
-def query_groq(prompt: str) -> str:
+def build_transcript_block(chunks: List[Dict[str, str]]) -> str:
+    # Memoizado por contenido: los mismos chunks (aunque vengan de otra
+    # entrada de caché o de otro video_id duplicado) producen el bloque
+    # una sola vez.
+    return _transcript_block_from_items(tuple((c["ts_range"], c["text"]) for c in chunks))
+
+def build_qa_messages(
+    chunks: List[Dict[str, str]],
+    question: str,
+) -> List[Dict[str, str]]:
+    """
+    Construye los mensajes system/user para Groq. El bloque de transcript
+    viene memoizado por contenido, así que las preguntas de seguimiento
+    sobre el mismo vídeo reutilizan el mensaje system (y Groq puede
+    reutilizar el prefijo).
+    """
+    system_msg = _SYSTEM_TEMPLATE.format_map({"lines": build_transcript_block(chunks)})
+    user_msg = _USER_TEMPLATE.format_map({"question": question})
+    return [
+        {"role": "system", "content": system_msg},
+        {"role": "user", "content": user_msg},
+    ]
+
+# Las respuestas factuales típicas caben de sobra en 384 tokens; generar de
+# más solo añade latencia lineal. Los stop cortan si el modelo empieza a
+# inventarse otra ronda de pregunta/respuesta.
+DEFAULT_MAX_TOKENS = 384
+DEFAULT_TEMPERATURE = 0.3
+_STOP_SEQUENCES = ["\n\nPregunta:", "\n\nRespuesta:"]
+
+def query_groq(
+    messages: List[Dict[str, str]],
+    model: str = MODEL_SMART,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+) -> str:
     completion = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
-        max_completion_tokens=1024,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_completion_tokens=max_tokens,
+        stop=_STOP_SEQUENCES,
         top_p=1,
         stream=True,
     )
-    answer = ""
+    parts = []
+    append = parts.append
     for chunk in completion:
-        answer += chunk.choices[0].delta.content or ""
-    return answer.strip()
+        content = chunk.choices[0].delta.content
+        if content:
+            append(content)
+    return "".join(parts).strip()
 
-def answer_question(video_arg: str, question: str) -> str:
+# Referencias vivas a tareas fire-and-forget: el event loop solo guarda
+# referencias débiles y las recogería a medias sin esto.
+_BACKGROUND_TASKS: set = set()
+
+async def _warm_groq_connection() -> None:
+    """Abre la conexión HTTPS con Groq mientras se descarga el transcript."""
+    try:
+        await client_async.models.list()
+    except Exception as e:
+        # Solo es un warm-up: si falla, la petición real ya informará del error.
+        logging.debug(f"Warm-up de Groq falló: {e}")
+
+async def stream_groq(
+    messages: List[Dict[str, str]],
+    model: str = MODEL_SMART,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+):
+    """
+    Versión en streaming de query_groq: genera cada delta de Groq según llega,
+    sin esperar a la respuesta completa. GROQ_SEMA acota las llamadas en vuelo.
+    """
+    async with GROQ_SEMA:
+        completion = await client_async.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_completion_tokens=max_tokens,
+            stop=_STOP_SEQUENCES,
+            top_p=1,
+            stream=True,
+        )
+        async for chunk in completion:
+            content = chunk.choices[0].delta.content
+            if content:
+                yield content
+
+def answer_question(
+    video_arg: str,
+    question: str,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+) -> str:
     video_id = extract_video_id(video_arg)
 
     # Opción A: usar YouTubeTranscriptApi
     chunks = get_timestamped_chunks(video_id)
 
-    # Opción B: usar yt-dlp + webvtt (descomenta para probar solo este)
+    # Opción B: usar yt-dlp + VTT (descomenta para probar solo este)
     #chunks = get_timestamped_chunks_yt_dlp(video_id)
 
-    prompt = build_qa_prompt(chunks, question)
-    return query_groq(prompt)
+    messages = build_qa_messages(chunks, question)
+    return query_groq(
+        messages,
+        model=_pick_model(messages, question),
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
+
+async def answer_question_stream(
+    video_arg: str,
+    question: str,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+):
+    """
+    Resuelve el transcript y devuelve un generador de eventos SSE
+    (`data: {json}\\n\\n`) con cada delta de Groq. Los errores de transcript
+    (sin subtítulos, vídeo no disponible…) se lanzan aquí, antes de que el
+    endpoint envíe cabeceras, para que puedan mapearse a un HTTP 500.
+    """
+    video_id = extract_video_id(video_arg)
+    # Lanza la descarga del transcript en paralelo con un warm-up del pool
+    # HTTPS de Groq, para no pagar el TLS handshake tras el fetch. El warm-up
+    # es fire-and-forget: con chunks cacheados (o pool ya caliente) esperar
+    # su round-trip solo añadiría latencia.
+    fetch_task = asyncio.create_task(asyncio.to_thread(get_timestamped_chunks, video_id))
+    warm_task = asyncio.create_task(_warm_groq_connection())
+    _BACKGROUND_TASKS.add(warm_task)
+    warm_task.add_done_callback(_BACKGROUND_TASKS.discard)
+    chunks = await fetch_task
+    messages = build_qa_messages(chunks, question)
+    return _sse_groq_stream(messages, question, temperature, max_tokens)
+
+async def _sse_groq_stream(
+    messages: List[Dict[str, str]],
+    question: str,
+    temperature: float,
+    max_tokens: int,
+):
+    try:
+        async for delta in stream_groq(
+            messages,
+            model=_pick_model(messages, question),
+            temperature=temperature,
+            max_tokens=max_tokens,
+        ):
+            yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+    except Exception as e:
+        # El 200 ya viajó con las cabeceras SSE: comunica el fallo como
+        # evento terminal en vez de cortar el stream sin explicación.
+        logging.error(f"Groq falló en mitad del stream: {e}")
+        yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+    else:
+        yield b"data: [DONE]\n\n"
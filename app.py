@@ -5,31 +5,31 @@ app.py – FastAPI que expone /qa y permite peticiones desde la extensión
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from starlette.concurrency import run_in_threadpool
 
-# función que genera el prompt y llama a Groq
-from ExtractorVideos import answer_question
+# función que genera el prompt y llama a Groq en streaming
+from ExtractorVideos import answer_question_stream
 
 # ──────────────────────────────  FastAPI  ──────────────────────────────
 app = FastAPI(
     title="YouTube-QA API",
     description="Devuelve respuestas de IA basadas en la transcripción del vídeo.",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 # ──────────────────────────────  CORS  ────────────────────────────────
-allow_origins = [
-    "http://localhost:*",
-    "chrome-extension://*",          # durante desarrollo
-]
-
+# Starlette no expande wildcards dentro de allow_origins (compara strings
+# literales), así que los orígenes van como regex. Métodos y cabeceras se
+# limitan a lo que usa la extensión y el preflight se cachea un día para
+# no pagar un OPTIONS extra por cada /qa.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=allow_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origin_regex=r"^(chrome-extension://[a-z]{32}|http://localhost(:\d+)?)$",
+    allow_methods=["POST"],
+    allow_headers=["Content-Type"],
+    max_age=86400,
 )
 
 # ──────────────────────────────  Esquemas  ────────────────────────────
@@ -37,22 +37,16 @@ class QARequest(BaseModel):
     video: str
     question: str
 
-class QAResponse(BaseModel):
-    answer: str
-
 # ──────────────────────────────  Endpoint  ────────────────────────────
-@app.post("/qa", response_model=QAResponse)
-async def qa_endpoint(req: QARequest) -> QAResponse:
+@app.post("/qa")
+async def qa_endpoint(req: QARequest) -> StreamingResponse:
     """
-    Devuelve la respuesta del LLM a la pregunta `req.question`
-    basada en la transcripción del vídeo `req.video`.
+    Emite por SSE la respuesta del LLM a la pregunta `req.question`
+    basada en la transcripción del vídeo `req.video`, token a token.
+    Los fallos al obtener el transcript se devuelven como HTTP 500.
     """
     try:
-        answer = await run_in_threadpool(
-            answer_question,
-            req.video,
-            req.question,
-        )
-        return QAResponse(answer=answer)
+        stream = await answer_question_stream(req.video, req.question)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
+    return StreamingResponse(stream, media_type="text/event-stream")